@@ -1,11 +1,14 @@
-import os
 import pickle
 from tqdm import tqdm
 
+from data_preparation import add_or_replace, get_source_pickle_files, stop_event_key, unpack_trip_tuple
+
 
 def load_all_trips(data_directories):
     """
     Loads all data from the specified directories, ignoring old_trips.pickle files.
+    Duplicate stop events (same route, station and planned datetime) are kept only once,
+    with the latest observation.
 
     Parameters:
     data_directories (list of str): List of paths to data directories.
@@ -14,27 +17,31 @@ def load_all_trips(data_directories):
     dict: A concatenated dictionary with data from all files.
     """
     all_trips = {}
-    
-    for directory in data_directories:
-        for filename in tqdm(os.listdir(directory)):
-            if filename.endswith(".pickle") and filename != "old_trips.pickle":
-                filepath = os.path.join(directory, filename)
-                try:
-                    with open(filepath, 'rb') as file:
-                        trips = pickle.load(file)
-                        # Data Merging
-                        for key, value in trips.items():
-                            if key in all_trips:
-                                for station, trips_list in value.items():
-                                    if station in all_trips[key]:
-                                        all_trips[key][station].extend(trips_list)
-                                    else:
-                                        all_trips[key][station] = trips_list
-                            else:
-                                all_trips[key] = value
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-    
+    trip_positions = {}  # { stop_event_key: index in all_trips[route][station] }
+    duplicates_removed = 0
+
+    for filepath in tqdm(get_source_pickle_files(data_directories)):
+        try:
+            with open(filepath, 'rb') as file:
+                trips = pickle.load(file)
+                # Data Merging
+                for key, value in trips.items():
+                    route_trips = all_trips.setdefault(key, {})
+                    for station, trips_list in value.items():
+                        station_trips = route_trips.setdefault(station, [])
+                        for trip in trips_list:
+                            # Only the planned datetime is needed for the key, transport is not guessed here
+                            unpacked = unpack_trip_tuple(trip, None)
+                            if unpacked is None:
+                                continue
+                            # The later observation replaces the earlier one
+                            trip_key = stop_event_key(key, station, unpacked[1])
+                            if add_or_replace(station_trips, trip_positions, trip_key, trip):
+                                duplicates_removed += 1
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+
+    print(f"Duplicates removed: {duplicates_removed}")
     return all_trips
 
 # Data folders
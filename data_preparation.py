@@ -47,80 +47,179 @@ def parse_transport_name(route_name: str) -> str:
         return raw.upper() if raw else "UNKNOWN"
 
 
+def get_source_pickle_files(data_directories):
+    """
+    Collects all source .pickle files from data_directories (ignoring old_trips.pickle)
+    and sorts them by collection time, oldest first.
+    Collection time is parsed from names like 'saved_trips_2024_11_5_14_30.pickle',
+    otherwise the file modification time is used.
+    Processing files in this order means that the latest observation of a stop event comes last.
+    """
+
+    source_files = []
+
+    for directory in data_directories:
+        if not os.path.isdir(directory):
+            print(f"Directory {directory} does not exist, skipping.")
+            continue
+
+        for filename in os.listdir(directory):
+            if filename.endswith(".pickle") and filename != "old_trips.pickle":
+                filepath = os.path.join(directory, filename)
+
+                # Name parts after the prefix: year, month, day, hour, minute
+                name_parts = filename[:-len(".pickle")].split("_")[-5:]
+                try:
+                    collected_at = datetime(*map(int, name_parts))
+                except (TypeError, ValueError):
+                    collected_at = datetime.fromtimestamp(os.path.getmtime(filepath))
+
+                source_files.append((collected_at, filepath))
+
+    source_files.sort()
+    return [filepath for _, filepath in source_files]
+
+
+def stop_event_key(route_name, station_name, planned_datetime):
+    """
+    Returns the key identifying one stop event: (route, station, planned datetime).
+    The collector's lookback windows overlap, so the same stop event
+    can be saved in several files under this key.
+    """
+
+    return (route_name, station_name, planned_datetime)
+
+
+def unpack_trip_tuple(trip_tuple, guessed_transport):
+    """
+    Unpacks a saved trip tuple into (transport, planned datetime, is_canceled, raw delay).
+    Supports the current format (transport, datetime, cancelled, delay)
+    and the older one (datetime, cancelled, delay), where guessed_transport is used.
+    Returns None for tuples of unknown format.
+    """
+
+    if len(trip_tuple) == 4:
+        return tuple(trip_tuple)
+    elif len(trip_tuple) == 3:
+        trip_datetime, is_canceled, trip_delay_raw = trip_tuple
+        return guessed_transport, trip_datetime, is_canceled, trip_delay_raw
+    # Unknown format
+    return None
+
+
+def add_or_replace(items, positions, key, value):
+    """
+    Appends value to items, or replaces the earlier value with the same key in place.
+    positions maps each key to its index in items and is updated here.
+    Returns True if an earlier value was replaced (a duplicate was found).
+    """
+
+    if key in positions:
+        items[positions[key]] = value
+        return True
+    positions[key] = len(items)
+    items.append(value)
+    return False
+
+
+def has_duplicate_stop_events(standardized_data):
+    """
+    Checks if standardized records contain the same stop event (route, station, datetime) more than once.
+    Such caches were built before duplicates were removed, in arbitrary file order.
+    """
+
+    seen_keys = set()
+    for rec in standardized_data:
+        key = stop_event_key(rec['route'], rec['station'], rec['datetime'])
+        if key in seen_keys:
+            return True
+        seen_keys.add(key)
+    return False
+
+
 def create_or_load_standardized_data(data_directories, output_file="standardized_data.pickle"):
     """
     If output_file already exists, loads standardized records from it and returns.
+    A file built before duplicates were removed is rebuilt from the source files instead.
     Otherwise, it goes through all .pickle files in data_directories, parses and saves to output_file.
+    Duplicate stop events (same route, station and planned datetime) are kept only once,
+    with the delay and cancellation status of the latest observation.
     Returns a list of dictionaries with keys:
     ['route', 'station', 'transport', 'datetime', 'is_canceled', 'delay'].
     """
 
+    source_files = get_source_pickle_files(data_directories)
+
     if os.path.isfile(output_file):
         print(f"File '{output_file}' already exists. Loading...")
         with open(output_file, "rb") as f:
             standardized_data = pickle.load(f)
         print(f"{len(standardized_data)} standardized records loaded.")
-        return standardized_data
 
-    print("File with standardized data not found. Starting parsing source .pickle...")
+        if not has_duplicate_stop_events(standardized_data):
+            return standardized_data
+        if not source_files:
+            print(f"[WARNING] '{output_file}' contains duplicate stop events, "
+                  f"but no source .pickle files were found to rebuild it.")
+            return standardized_data
 
-    from_path_records = []  # We will collect all the records here
-
-    for directory in data_directories:
-        if not os.path.isdir(directory):
-            print(f"Directory {directory} does not exist, skipping.")
-            continue
-
-        for filename in tqdm(os.listdir(directory)):
-            if filename.endswith(".pickle") and filename != "old_trips.pickle":
-                filepath = os.path.join(directory, filename)
+        # The latest observation can only be found in the source files, sorted by collection time
+        print(f"'{output_file}' contains duplicate stop events. Rebuilding it from source .pickle...")
+        del standardized_data
+    else:
+        print("File with standardized data not found. Starting parsing source .pickle...")
 
-                try:
-                    with open(filepath, 'rb') as file:
-                        trips_dict = pickle.load(file)
-                        # trips_dict format: { route_name: {station_name: [trip_tuple, ...]}, ... }
-
-                        for route_name, stations_info in trips_dict.items():
-                            guessed_transport = parse_transport_name(route_name)
-
-                            for station_name, trip_list in stations_info.items():
-                                for trip_tuple in trip_list:
-                                    if len(trip_tuple) == 4:
-                                        trip_transport, trip_datetime, is_canceled, trip_delay_raw = trip_tuple
-                                    elif len(trip_tuple) == 3:
-                                        trip_transport = guessed_transport
-                                        trip_datetime, is_canceled, trip_delay_raw = trip_tuple
-                                    else:
-                                        # Unknown format
-                                        continue
-
-                                    if isinstance(trip_delay_raw, timedelta):
-                                        delay_minutes = trip_delay_raw.total_seconds() / 60.0
-                                    elif isinstance(trip_delay_raw, (int, float)):
-                                        delay_minutes = float(trip_delay_raw)
-                                    else:
-                                        # Incorrect format
-                                        continue
-
-                                    # datetime
-                                    if not isinstance(trip_datetime, datetime):
-                                        continue
-
-                                    record = {
-                                        'route': route_name,
-                                        'station': station_name,
-                                        'transport': parse_transport_name(trip_transport),
-                                        'datetime': trip_datetime,
-                                        'is_canceled': bool(is_canceled),
-                                        'delay': delay_minutes
-                                    }
-
-                                    from_path_records.append(record)
-
-                except Exception as e:
-                    print(f"[ERROR] Error while processing {filepath} -> {e}")
-
-    print(f"Total {len(from_path_records)} records received.")
+    from_path_records = []  # We will collect all the records here
+    record_positions = {}  # { stop_event_key: index in from_path_records }
+    duplicates_removed = 0
+
+    # Files are processed one by one, oldest first, so only unique stop events are kept in memory
+    for filepath in tqdm(source_files):
+        try:
+            with open(filepath, 'rb') as file:
+                trips_dict = pickle.load(file)
+                # trips_dict format: { route_name: {station_name: [trip_tuple, ...]}, ... }
+
+                for route_name, stations_info in trips_dict.items():
+                    guessed_transport = parse_transport_name(route_name)
+
+                    for station_name, trip_list in stations_info.items():
+                        for trip_tuple in trip_list:
+                            unpacked = unpack_trip_tuple(trip_tuple, guessed_transport)
+                            if unpacked is None:
+                                continue
+                            trip_transport, trip_datetime, is_canceled, trip_delay_raw = unpacked
+
+                            if isinstance(trip_delay_raw, timedelta):
+                                delay_minutes = trip_delay_raw.total_seconds() / 60.0
+                            elif isinstance(trip_delay_raw, (int, float)):
+                                delay_minutes = float(trip_delay_raw)
+                            else:
+                                # Incorrect format
+                                continue
+
+                            # datetime
+                            if not isinstance(trip_datetime, datetime):
+                                continue
+
+                            record = {
+                                'route': route_name,
+                                'station': station_name,
+                                'transport': parse_transport_name(trip_transport),
+                                'datetime': trip_datetime,
+                                'is_canceled': bool(is_canceled),
+                                'delay': delay_minutes
+                            }
+
+                            # Same stop event seen again -> the later observation replaces the earlier one
+                            key = stop_event_key(route_name, station_name, trip_datetime)
+                            if add_or_replace(from_path_records, record_positions, key, record):
+                                duplicates_removed += 1
+
+        except Exception as e:
+            print(f"[ERROR] Error while processing {filepath} -> {e}")
+
+    print(f"Total {len(from_path_records)} records received, {duplicates_removed} duplicates removed.")
 
     # Save to file
     with open(output_file, "wb") as f_out: